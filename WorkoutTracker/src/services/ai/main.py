@@ -5,18 +5,26 @@ Main FastAPI application for handling agent interactions
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator, TYPE_CHECKING
+from datetime import datetime, timezone
+from cachetools import TTLCache
+import asyncio
 import os
-from dotenv import load_dotenv
 import logging
+import orjson
 
-from core.agent_orchestrator import AgentOrchestrator
 from config.personalities import PersonalitySystem
 from config.settings import Settings
 
-# Load environment variables
-load_dotenv()
+if TYPE_CHECKING:
+    from core.agent_orchestrator import AgentOrchestrator
+
+# Load environment variables from .env outside of deployed environments
+if os.getenv("ENVIRONMENT", "development") == "development":
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Configure logging
 logging.basicConfig(
@@ -29,7 +37,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI Fitness Coach Agent Service",
     description="LangGraph-powered agent system for personalized fitness coaching",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -45,9 +54,51 @@ app.add_middleware(
 settings = Settings()
 
 # Initialize agent system
-orchestrator = AgentOrchestrator(settings)
 personality_system = PersonalitySystem()
 
+# Single in-flight build of the orchestrator, shared by the startup warm-up and requests
+orchestrator_build: Optional["asyncio.Task[AgentOrchestrator]"] = None
+
+def build_orchestrator() -> "AgentOrchestrator":
+    """Build the agent orchestrator, importing the LLM stack only when first needed"""
+    from core.agent_orchestrator import AgentOrchestrator
+    return AgentOrchestrator(settings)
+
+def on_orchestrator_built(task: "asyncio.Task[AgentOrchestrator]"):
+    """Log a failed build and clear it so the next request retries"""
+    global orchestrator_build
+    if task.cancelled() or task.exception() is None:
+        return
+    logger.error("Failed to initialize agent orchestrator", exc_info=task.exception())
+    orchestrator_build = None
+
+def start_orchestrator_build() -> "asyncio.Task[AgentOrchestrator]":
+    """Start building the orchestrator in a worker thread unless a build already exists"""
+    global orchestrator_build
+    if orchestrator_build is None:
+        orchestrator_build = asyncio.create_task(asyncio.to_thread(build_orchestrator))
+        orchestrator_build.add_done_callback(on_orchestrator_built)
+    return orchestrator_build
+
+async def get_orchestrator() -> "AgentOrchestrator":
+    """Dependency returning the shared orchestrator, waiting for the build if needed"""
+    build = start_orchestrator_build()
+    if build.done():
+        return build.result()
+    # Shield the shared build so a disconnecting client doesn't cancel it for everyone
+    return await asyncio.shield(build)
+
+# Readiness inputs rarely change within a day, so scores are cached per (user_id, date).
+# The cache is per worker with no cross-worker invalidation, so the short TTL is what
+# bounds how long a score can lag behind newly logged data.
+readiness_cache: "TTLCache[Tuple[str, str], Dict[str, Any]]" = TTLCache(maxsize=10_000, ttl=300)
+readiness_in_flight: Dict[Tuple[str, str], "asyncio.Task[Dict[str, Any]]"] = {}
+
+@app.on_event("startup")
+async def warm_orchestrator():
+    """Warm the orchestrator in the background so the socket binds immediately"""
+    start_orchestrator_build()
+
 # Request/Response Models
 class ChatRequest(BaseModel):
     message: str
@@ -90,14 +141,22 @@ async def health_check():
         "version": "1.0.0"
     }
 
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """Encode a payload as a server-sent event frame"""
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    return b"event: " + event.encode() + b"\n" + frame if event else frame
+
 # Main chat endpoint
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(
+    request: ChatRequest,
+    orchestrator: "AgentOrchestrator" = Depends(get_orchestrator)
+):
     """
     Main conversational interface for agent interactions
     """
     try:
-        logger.info(f"Chat request from user {request.user_id}: {request.message[:50]}...")
+        logger.info("Chat request from user %s: %.50s...", request.user_id, request.message)
 
         # Get personality configuration
         personality_config = personality_system.get_persona_config(request.persona)
@@ -111,56 +170,128 @@ async def chat(request: ChatRequest):
             context=request.context
         )
 
-        logger.info(f"Successfully processed chat for user {request.user_id}")
+        logger.info("Successfully processed chat for user %s", request.user_id)
 
-        return ChatResponse(
-            response=result["response"],
-            agent_id=result["agent_id"],
-            conversation_id=result["conversation_id"],
-            intent=result["intent"],
-            actions=result.get("actions"),
-            references=result.get("references")
-        )
+        # Trusted orchestrator payload: skip response_model validation, which
+        # stays on the route for the OpenAPI schema
+        return ORJSONResponse({
+            "response": result["response"],
+            "agent_id": result["agent_id"],
+            "conversation_id": result["conversation_id"],
+            "intent": result["intent"],
+            "actions": result.get("actions"),
+            "references": result.get("references")
+        })
 
     except Exception as e:
-        logger.error(f"Error processing chat request: {str(e)}")
+        logger.error("Error processing chat request: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+# Streaming chat endpoint
+@app.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    orchestrator: "AgentOrchestrator" = Depends(get_orchestrator)
+):
+    """
+    Stream the agent response as server-sent events while it is generated
+    """
+    logger.info("Streaming chat request from user %s: %.50s...", request.user_id, request.message)
+
+    personality_config = personality_system.get_persona_config(request.persona)
+
+    async def event_generator() -> AsyncIterator[bytes]:
+        # Chunks are {"delta": str}; metadata chunks may carry conversation_id/agent_id
+        metadata: Dict[str, Any] = {}
+        try:
+            async for chunk in orchestrator.process_message_stream(
+                user_id=request.user_id,
+                message=request.message,
+                conversation_id=request.conversation_id,
+                persona_config=personality_config,
+                context=request.context
+            ):
+                # Deltas are forwarded as-is and never accumulated into the full response
+                if "delta" not in chunk:
+                    metadata.update(chunk)
+                yield sse_event(chunk)
+
+            logger.info("Successfully streamed chat for user %s", request.user_id)
+            yield sse_event(metadata, event="done")
+
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error("Error streaming chat request: %s", e)
+            yield sse_event({"detail": str(e)}, event="error")
+
+    # Keep caches and buffering proxies (nginx) from holding frames back
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def get_readiness(orchestrator: "AgentOrchestrator", user_id: str, date: str) -> Dict[str, Any]:
+    """Get a cached readiness result, running the agent at most once per concurrent miss"""
+    cache_key = (user_id, date)
+    result = readiness_cache.get(cache_key)
+    if result is not None:
+        return result
+
+    task = readiness_in_flight.get(cache_key)
+    if task is None:
+        # Process through readiness agent
+        task = asyncio.create_task(orchestrator.calculate_readiness(user_id=user_id, date=date))
+        readiness_in_flight[cache_key] = task
+
+        def on_done(done: "asyncio.Task[Dict[str, Any]]"):
+            readiness_in_flight.pop(cache_key, None)
+            if not done.cancelled() and done.exception() is None:
+                readiness_cache[cache_key] = done.result()
+
+        task.add_done_callback(on_done)
+
+    # Shield the shared task so one cancelled request doesn't fail the others waiting on it
+    return await asyncio.shield(task)
+
 # Daily readiness briefing endpoint
 @app.post("/readiness", response_model=ReadinessResponse)
-async def calculate_readiness(request: ReadinessRequest):
+async def calculate_readiness(
+    request: ReadinessRequest,
+    orchestrator: "AgentOrchestrator" = Depends(get_orchestrator)
+):
     """
     Calculate readiness score and generate recommendations
     """
     try:
-        logger.info(f"Calculating readiness for user {request.user_id}")
+        logger.info("Calculating readiness for user %s", request.user_id)
 
-        # Process through readiness agent
-        result = await orchestrator.calculate_readiness(
-            user_id=request.user_id,
-            date=request.date
-        )
+        date = request.date or datetime.now(timezone.utc).date().isoformat()
+        result = await get_readiness(orchestrator, request.user_id, date)
 
-        return ReadinessResponse(
-            readiness_score=result["readiness_score"],
-            components=result["components"],
-            recommendations=result["recommendations"],
-            adjustment=result.get("adjustment"),
-            message=result["message"]
-        )
+        return ORJSONResponse({
+            "readiness_score": result["readiness_score"],
+            "components": result["components"],
+            "recommendations": result["recommendations"],
+            "adjustment": result.get("adjustment"),
+            "message": result["message"]
+        })
 
     except Exception as e:
-        logger.error(f"Error calculating readiness: {str(e)}")
+        logger.error("Error calculating readiness: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Generate training plan endpoint
 @app.post("/generate-plan")
-async def generate_plan(request: PlanGenerationRequest):
+async def generate_plan(
+    request: PlanGenerationRequest,
+    orchestrator: "AgentOrchestrator" = Depends(get_orchestrator)
+):
     """
     Generate initial training plan during onboarding
     """
     try:
-        logger.info(f"Generating plan for user {request.user_id}")
+        logger.info("Generating plan for user %s", request.user_id)
 
         result = await orchestrator.generate_training_plan(
             user_id=request.user_id,
@@ -175,7 +306,7 @@ async def generate_plan(request: PlanGenerationRequest):
         }
 
     except Exception as e:
-        logger.error(f"Error generating plan: {str(e)}")
+        logger.error("Error generating plan: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Voice transcription endpoint (for future voice feature)
@@ -198,4 +329,14 @@ async def synthesize_voice(text: str, persona: str = "calm"):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Reload is single-process, so workers only apply when DEBUG is off; "auto" picks
+    # uvloop when installed (it is not available on Windows)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "2")),
+        loop="auto",
+        http="httptools",
+        reload=os.getenv("DEBUG") == "1"
+    )